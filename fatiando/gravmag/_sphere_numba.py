@@ -0,0 +1,64 @@
+"""
+A numba implementation of the sphere magnetic and gravity effects.
+
+These functions compute the combined effect of a set of spheres. They are used
+by fatiando.gravmag.sphere as a backend and are not meant to be used directly.
+
+The spheres are given as separate arrays for each of their attributes
+(``xc``, ``yc``, ``zc``, and the magnetic moment or mass) instead of a list of
+:class:`fatiando.mesher.Sphere`. The loop over computation points runs in
+parallel and all intermediate values are kept as scalars, so no temporary
+arrays are allocated.
+
+All arrays must have the same dtype. Numerical constants are converted to
+this dtype so that the computations are done entirely in float32 if the
+arrays are float32.
+"""
+from __future__ import division, absolute_import
+import numba
+import numpy as np
+
+
+@numba.jit(nopython=True, parallel=True, fastmath=True, cache=True)
+def induction(xp, yp, zp, xc, yc, zc, mx, my, mz, fx, fy, fz, result):
+    """
+    Magnetic induction of the spheres projected onto the unit vector
+    (fx, fy, fz), without the CM*T2NT factor.
+
+    mx, my, mz are the magnetic moments (magnetization times volume).
+
+    Use the regional field direction for the total-field anomaly and the
+    coordinate axes for the bx, by, and bz components.
+    """
+    one = result.dtype.type(1)
+    three = result.dtype.type(3)
+    # f.B = (3(m.r)(f.r) - r^2 (f.m))/r^5 so there is no need to compute the
+    # three components of B
+    fdotm = fx*mx + fy*my + fz*mz
+    for i in numba.prange(result.size):
+        total = result.dtype.type(0)
+        for k in range(xc.size):
+            x = xc[k] - xp[i]
+            y = yc[k] - yp[i]
+            z = zc[k] - zp[i]
+            r_sqr = x*x + y*y + z*z
+            # One sqrt and a division instead of pow(r_sqr, 2.5)
+            coef = one/(r_sqr*r_sqr*np.sqrt(r_sqr))
+            dotprod = mx[k]*x + my[k]*y + mz[k]*z
+            fdotr = fx*x + fy*y + fz*z
+            total += coef*(three*dotprod*fdotr - r_sqr*fdotm[k])
+        result[i] += total
+
+
+@numba.jit(nopython=True, parallel=True, fastmath=True, cache=True)
+def gz(xp, yp, zp, xc, yc, zc, mass, result):
+    "Vertical gravitational attraction (without the G*SI2MGAL factor)"
+    for i in numba.prange(result.size):
+        total = result.dtype.type(0)
+        for k in range(xc.size):
+            x = xc[k] - xp[i]
+            y = yc[k] - yp[i]
+            z = zc[k] - zp[i]
+            r_sqr = x*x + y*y + z*z
+            total += mass[k]*z/(r_sqr*np.sqrt(r_sqr))
+        result[i] += total
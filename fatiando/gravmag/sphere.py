@@ -7,6 +7,7 @@ import numpy as np
 
 from ..constants import SI2MGAL, G, CM, T2NT, SI2EOTVOS
 from .. import utils
+from . import _sphere_numba
 from .._our_duecredit import due, Doi
 
 
@@ -15,6 +16,148 @@ due.cite(Doi("10.1017/CBO9780511549816"),
          path='fatiando.gravmag.sphere')
 
 
+def _induction(xp, yp, zp, spheres, pmag, fx, fy, fz, dtype='float',
+               tol=0):
+    """
+    The magnetic induction of the spheres projected onto the unit vector
+    (fx, fy, fz). Used to calculate tf, bx, by, and bz.
+    """
+    # The numba kernels index yp and zp like xp without checking bounds, so
+    # broadcast the coordinates (e.g., a scalar height) to the same shape.
+    # Raises a ValueError if the shapes are incompatible.
+    xp, yp, zp = np.broadcast_arrays(xp, yp, zp)
+    res = np.zeros(xp.shape, dtype=dtype)
+    xp, yp, zp = _flat(xp), _flat(yp), _flat(zp)
+    xc, yc, zc, radius, mag = _pack_spheres(spheres, 'magnetization', pmag)
+    # Compute the magnetic moments once instead of for every point
+    moment = mag*(4*np.pi*(radius**3)/3)
+    if tol > 0 and xp.size > 0:
+        # The induction of a dipole is at most 2*|moment|/r^3
+        distance = _min_distance(xp, yp, zp, xc, yc, zc)
+        intensity = np.sqrt(np.sum(moment**2, axis=0))
+        keep = 2*CM*T2NT*intensity >= tol*distance**3
+        xc, yc, zc, moment = xc[keep], yc[keep], zc[keep], moment[:, keep]
+    xp, yp, zp, xc, yc, zc = _local_coordinates(xp, yp, zp, xc, yc, zc,
+                                                dtype)
+    mx, my, mz = np.ascontiguousarray(moment, dtype=dtype)
+    fx, fy, fz = np.array([fx, fy, fz], dtype=dtype)
+    _sphere_numba.induction(xp, yp, zp, xc, yc, zc, mx, my, mz, fx, fy, fz,
+                            res.ravel())
+    res *= CM*T2NT
+    return res
+
+
+def _local_coordinates(xp, yp, zp, xc, yc, zc, dtype):
+    """
+    Move the origin to the center of the computation points and convert the
+    coordinates to *dtype*.
+
+    The shift is done in float64. Absolute coordinates can be large (e.g.,
+    UTM) and casting them directly to float32 would round them to ~0.5 m.
+
+    >>> import numpy as np
+    >>> xp, yp, zp = np.array([[7e6, 7e6 + 10], [0, 10], [0, 0]])
+    >>> xc, yc, zc = np.array([[7e6 + 0.1], [5.1], [10]])
+    >>> coords = _local_coordinates(xp, yp, zp, xc, yc, zc, 'float32')
+    >>> print(coords[0].tolist())
+    [-5.0, 5.0]
+    >>> print(coords[3].dtype)
+    float32
+    >>> print('{:.4f}'.format(coords[3][0]))
+    -4.9000
+
+    """
+    coordinates = []
+    for points, centers in [(xp, xc), (yp, yc), (zp, zc)]:
+        if points.size > 0:
+            origin = 0.5*(points.min() + points.max())
+        else:
+            origin = 0
+        coordinates.append(np.ascontiguousarray(points - origin, dtype=dtype))
+        coordinates.append(np.ascontiguousarray(centers - origin,
+                                                dtype=dtype))
+    xp, xc, yp, yc, zp, zc = coordinates
+    return xp, yp, zp, xc, yc, zc
+
+
+def _min_distance(xp, yp, zp, xc, yc, zc):
+    """
+    A lower bound for the distance between each sphere center and the
+    computation points: the distance to the points' bounding box.
+
+    >>> import numpy as np
+    >>> xp, yp, zp = np.array([[0, 10], [0, 10], [0, 0]], dtype='float')
+    >>> xc, yc, zc = np.array([[5, 13], [5, 14], [0, -12]], dtype='float')
+    >>> print(_min_distance(xp, yp, zp, xc, yc, zc).tolist())
+    [0.0, 13.0]
+
+    """
+    dx = np.maximum(0, np.maximum(xp.min() - xc, xc - xp.max()))
+    dy = np.maximum(0, np.maximum(yp.min() - yc, yc - yp.max()))
+    dz = np.maximum(0, np.maximum(zp.min() - zc, zc - zp.max()))
+    return np.sqrt(dx**2 + dy**2 + dz**2)
+
+
+def _pack_spheres(spheres, prop, value=None):
+    """
+    Pack the spheres into one contiguous float64 array per attribute.
+
+    Spheres that are ``None`` or without the physical property *prop* are
+    skipped. If *value* is not None, it is used as the physical property of
+    all spheres instead.
+
+    Returns the arrays ``xc, yc, zc, radius, props``. If the physical property
+    is a vector (like ``'magnetization'``), ``props`` has one row per vector
+    component.
+
+    >>> from fatiando.mesher import Sphere
+    >>> spheres = [Sphere(1, 2, 3, 4, {'density': 5}), None,
+    ...            Sphere(6, 7, 8, 9)]
+    >>> for array in _pack_spheres(spheres, 'density'):
+    ...     print(array.tolist())
+    [1.0]
+    [2.0]
+    [3.0]
+    [4.0]
+    [5.0]
+    >>> xc, yc, zc, radius, mag = _pack_spheres(spheres, 'magnetization',
+    ...                                         [1, 2, 3])
+    >>> print(xc.tolist())
+    [1.0, 6.0]
+    >>> print(radius.tolist())
+    [4.0, 9.0]
+    >>> print(mag.tolist())
+    [[1.0, 1.0], [2.0, 2.0], [3.0, 3.0]]
+
+    """
+    geometry = []
+    props = []
+    for sphere in spheres:
+        if sphere is None:
+            continue
+        if prop not in sphere.props and value is None:
+            continue
+        geometry.append([sphere.x, sphere.y, sphere.z, sphere.radius])
+        if value is None:
+            props.append(sphere.props[prop])
+        else:
+            props.append(value)
+    xc, yc, zc, radius = np.array(geometry, dtype='float').reshape(-1, 4).T
+    props = np.array(props, dtype='float')
+    if prop == 'magnetization':
+        props = props.reshape(-1, 3)
+    return (np.ascontiguousarray(xc), np.ascontiguousarray(yc),
+            np.ascontiguousarray(zc), np.ascontiguousarray(radius),
+            np.ascontiguousarray(props.T))
+
+
+def _flat(coordinate):
+    """
+    Make a contiguous 1D float64 array out of a coordinate array for numba.
+    """
+    return np.ascontiguousarray(coordinate, dtype='float').ravel()
+
+
 # These are the second derivatives of the V = 1/r function that is used by the
 # magnetic field component, total-field magnetic anomaly, gravity gradients,
 # and the kernel functions.
@@ -42,7 +185,7 @@ def _v_zz(x, y, z, r_sqr, r_5):
     return (3*z**2 - r_sqr)/r_5
 
 
-def tf(xp, yp, zp, spheres, inc, dec, pmag=None):
+def tf(xp, yp, zp, spheres, inc, dec, pmag=None, dtype='float', tol=0):
     r"""
     The total-field magnetic anomaly.
 
@@ -84,6 +227,19 @@ def tf(xp, yp, zp, spheres, inc, dec, pmag=None):
         A magnetization vector. If not None, will use this value instead of the
         ``'magnetization'`` property of the spheres. Use this, e.g., for
         sensitivity matrix building.
+    * dtype : str or numpy dtype
+        The floating point type used in the computations and for the output.
+        Use ``'float32'`` to compute roughly twice as fast. Single precision
+        has ~7 significant digits. The coordinates are moved to an origin at
+        the center of the computation points (in float64) before the
+        conversion, so large coordinates (e.g., UTM) don't lose precision.
+    * tol : float
+        Spheres whose anomaly is smaller than *tol* (in nT) on all computation
+        points are ignored. The bound is computed from the distance to the
+        bounding box of the computation points, so far away spheres are
+        skipped without computing their anomaly. The error of the result is
+        at most *tol* times the number of ignored spheres. Use 0 to compute
+        all spheres.
 
     Returns:
 
@@ -97,34 +253,7 @@ def tf(xp, yp, zp, spheres, inc, dec, pmag=None):
 
     """
     fx, fy, fz = utils.dircos(inc, dec)
-    if pmag is not None:
-        pmx, pmy, pmz = pmag
-    res = 0
-    for sphere in spheres:
-        if sphere is None:
-            continue
-        if 'magnetization' not in sphere.props and pmag is None:
-            continue
-        if pmag is None:
-            mx, my, mz = sphere.props['magnetization']
-        else:
-            mx, my, mz = pmx, pmy, pmz
-        x = sphere.x - xp
-        y = sphere.y - yp
-        z = sphere.z - zp
-        r_sqr = x**2 + y**2 + z**2
-        # This is faster than r5 = r_sqrt**2.5
-        r = np.sqrt(r_sqr)
-        r_5 = r*r*r*r*r
-        volume = 4*np.pi*(sphere.radius**3)/3
-        # Calculating v_xx, etc to calculate B is ~2x slower than this
-        dotprod = mx*x + my*y + mz*z
-        bx = (3*dotprod*x - r_sqr*mx)/r_5
-        by = (3*dotprod*y - r_sqr*my)/r_5
-        bz = (3*dotprod*z - r_sqr*mz)/r_5
-        res += volume*(fx*bx + fy*by + fz*bz)
-    res *= CM*T2NT
-    return res
+    return _induction(xp, yp, zp, spheres, pmag, fx, fy, fz, dtype, tol)
 
 
 def bx(xp, yp, zp, spheres, pmag=None):
@@ -162,31 +291,7 @@ def bx(xp, yp, zp, spheres, pmag=None):
     Applications, Cambridge University Press.
 
     """
-    if pmag is not None:
-        pmx, pmy, pmz = pmag
-    res = 0
-    for sphere in spheres:
-        if sphere is None:
-            continue
-        if 'magnetization' not in sphere.props and pmag is None:
-            continue
-        if pmag is None:
-            mx, my, mz = sphere.props['magnetization']
-        else:
-            mx, my, mz = pmx, pmy, pmz
-        x = sphere.x - xp
-        y = sphere.y - yp
-        z = sphere.z - zp
-        r_sqr = x**2 + y**2 + z**2
-        # This is faster than r5 = r_sqrt**2.5
-        r = np.sqrt(r_sqr)
-        r_5 = r*r*r*r*r
-        volume = 4*np.pi*(sphere.radius**3)/3
-        # Calculating v_xx, etc to calculate B is ~1.3x slower than this
-        dotprod = mx*x + my*y + mz*z
-        res += volume*(3*dotprod*x - r_sqr*mx)/r_5
-    res *= CM * T2NT
-    return res
+    return _induction(xp, yp, zp, spheres, pmag, 1, 0, 0)
 
 
 def by(xp, yp, zp, spheres, pmag=None):
@@ -224,31 +329,7 @@ def by(xp, yp, zp, spheres, pmag=None):
     Applications, Cambridge University Press.
 
     """
-    if pmag is not None:
-        pmx, pmy, pmz = pmag
-    res = 0
-    for sphere in spheres:
-        if sphere is None:
-            continue
-        if 'magnetization' not in sphere.props and pmag is None:
-            continue
-        if pmag is None:
-            mx, my, mz = sphere.props['magnetization']
-        else:
-            mx, my, mz = pmx, pmy, pmz
-        x = sphere.x - xp
-        y = sphere.y - yp
-        z = sphere.z - zp
-        r_sqr = x**2 + y**2 + z**2
-        # This is faster than r5 = r_sqrt**2.5
-        r = np.sqrt(r_sqr)
-        r_5 = r*r*r*r*r
-        volume = 4*np.pi*(sphere.radius**3)/3
-        # Calculating v_xx, etc to calculate B is ~1.3x slower than this
-        dotprod = mx*x + my*y + mz*z
-        res += volume*(3*dotprod*y - r_sqr*my)/r_5
-    res *= CM * T2NT
-    return res
+    return _induction(xp, yp, zp, spheres, pmag, 0, 1, 0)
 
 
 def bz(xp, yp, zp, spheres, pmag=None):
@@ -286,34 +367,10 @@ def bz(xp, yp, zp, spheres, pmag=None):
     Applications, Cambridge University Press.
 
     """
-    if pmag is not None:
-        pmx, pmy, pmz = pmag
-    res = 0
-    for sphere in spheres:
-        if sphere is None:
-            continue
-        if 'magnetization' not in sphere.props and pmag is None:
-            continue
-        if pmag is None:
-            mx, my, mz = sphere.props['magnetization']
-        else:
-            mx, my, mz = pmx, pmy, pmz
-        x = sphere.x - xp
-        y = sphere.y - yp
-        z = sphere.z - zp
-        r_sqr = x**2 + y**2 + z**2
-        # This is faster than r5 = r_sqrt**2.5
-        r = np.sqrt(r_sqr)
-        r_5 = r*r*r*r*r
-        volume = 4*np.pi*(sphere.radius**3)/3
-        # Calculating v_xx, etc to calculate B is ~1.3x slower than this
-        dotprod = mx*x + my*y + mz*z
-        res += volume*(3*dotprod*z - r_sqr*mz)/r_5
-    res *= CM * T2NT
-    return res
+    return _induction(xp, yp, zp, spheres, pmag, 0, 0, 1)
 
 
-def gz(xp, yp, zp, spheres, dens=None):
+def gz(xp, yp, zp, spheres, dens=None, dtype='float', tol=0):
     r"""
     The :math:`g_z` gravitational acceleration component.
 
@@ -339,6 +396,19 @@ def gz(xp, yp, zp, spheres, dens=None):
     * dens : float or None
         If not None, will use this value instead of the ``'density'`` property
         of the spheres. Use this, e.g., for sensitivity matrix building.
+    * dtype : str or numpy dtype
+        The floating point type used in the computations and for the output.
+        Use ``'float32'`` to compute roughly twice as fast. Single precision
+        has ~7 significant digits. The coordinates are moved to an origin at
+        the center of the computation points (in float64) before the
+        conversion, so large coordinates (e.g., UTM) don't lose precision.
+    * tol : float
+        Spheres whose effect is smaller than *tol* (in mGal) on all
+        computation points are ignored. The bound is computed from the
+        distance to the bounding box of the computation points, so far away
+        spheres are skipped without computing their effect. The error of the
+        result is at most *tol* times the number of ignored spheres. Use 0 to
+        compute all spheres.
 
     Returns:
 
@@ -351,24 +421,23 @@ def gz(xp, yp, zp, spheres, dens=None):
     Applications, Cambridge University Press.
 
     """
-    res = 0
-    for sphere in spheres:
-        if sphere is None:
-            continue
-        if 'density' not in sphere.props and dens is None:
-            continue
-        if dens is None:
-            density = sphere.props['density']
-        else:
-            density = dens
-        x = sphere.x - xp
-        y = sphere.y - yp
-        z = sphere.z - zp
-        r = np.sqrt(x**2 + y**2 + z**2)
-        # This is faster than r3 = r_sqrt**1.5
-        r_cb = r*r*r
-        mass = density*4*np.pi*(sphere.radius**3)/3
-        res += mass*z/r_cb
+    # The numba kernels index yp and zp like xp without checking bounds, so
+    # broadcast the coordinates (e.g., a scalar height) to the same shape.
+    # Raises a ValueError if the shapes are incompatible.
+    xp, yp, zp = np.broadcast_arrays(xp, yp, zp)
+    res = np.zeros(xp.shape, dtype=dtype)
+    xp, yp, zp = _flat(xp), _flat(yp), _flat(zp)
+    xc, yc, zc, radius, density = _pack_spheres(spheres, 'density', dens)
+    # Compute the masses once instead of for every point
+    mass = density*(4*np.pi*(radius**3)/3)
+    if tol > 0 and xp.size > 0:
+        distance = _min_distance(xp, yp, zp, xc, yc, zc)
+        keep = G*SI2MGAL*np.abs(mass) >= tol*distance**2
+        xc, yc, zc, mass = xc[keep], yc[keep], zc[keep], mass[keep]
+    xp, yp, zp, xc, yc, zc = _local_coordinates(xp, yp, zp, xc, yc, zc,
+                                                dtype)
+    mass = mass.astype(dtype)
+    _sphere_numba.gz(xp, yp, zp, xc, yc, zc, mass, res.ravel())
     res *= G*SI2MGAL
     return res
 
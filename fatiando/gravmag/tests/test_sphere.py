@@ -130,3 +130,119 @@ def test_sphere_ignore_missing_prop(data, model):
         else:
             result = getattr(sphere, field)(x, y, z, model2)
         npt.assert_allclose(result, data[field], atol=1e-10, rtol=0)
+
+
+def test_sphere_float32(data, model):
+    "Sphere tf and gz computed in single precision match the saved results"
+    x, y, z = data['x'], data['y'], data['z']
+    inc, dec = data['inc'], data['dec']
+    for field in ['tf', 'gz']:
+        if field == 'tf':
+            result = sphere.tf(x, y, z, model, inc, dec, dtype='float32')
+        else:
+            result = sphere.gz(x, y, z, model, dtype='float32')
+        assert result.dtype == np.float32
+        tolerance = 1e-5*np.abs(data[field]).max()
+        npt.assert_allclose(result, data[field], rtol=0, atol=tolerance)
+
+
+def test_sphere_float32_large_coordinates(data, model):
+    "Sphere tf and gz in single precision don't lose precision far from 0"
+    x, y, z = data['x'], data['y'], data['z']
+    inc, dec = data['inc'], data['dec']
+    # Shift everything to UTM-like coordinates with a non-integer part
+    east, north = 7e6 + 0.3183, 5e5 + 0.5772
+    props = model[0].props
+    shifted = [Sphere(x=s.x + east, y=s.y + north, z=s.z, radius=s.radius,
+                      props=props)
+               for s in model]
+    for field in ['tf', 'gz']:
+        if field == 'tf':
+            result = sphere.tf(x + east, y + north, z, shifted, inc, dec,
+                               dtype='float32')
+        else:
+            result = sphere.gz(x + east, y + north, z, shifted,
+                               dtype='float32')
+        tolerance = 1e-5*np.abs(data[field]).max()
+        npt.assert_allclose(result, data[field], rtol=0, atol=tolerance)
+
+
+def test_sphere_uniform_magnetization_large_coordinates(data, model):
+    "Sphere tf in single and double precision is the same far from 0"
+    x, y, z = data['x'], data['y'], data['z']
+    inc, dec = data['inc'], data['dec']
+    east, north = 7e6 + 0.3183, 5e5 + 0.5772
+    props = model[0].props
+    shifted = [Sphere(x=s.x + east, y=s.y + north, z=s.z, radius=s.radius,
+                      props=props)
+               for s in model]
+    for dtype in ['float64', 'float32']:
+        result = sphere.tf(x + east, y + north, z, shifted, inc, dec,
+                           dtype=dtype)
+        tolerance = 1e-5*np.abs(data['tf']).max()
+        npt.assert_allclose(result, data['tf'], rtol=0, atol=tolerance)
+
+
+def test_sphere_tol_ignores_far_spheres(data, model):
+    "Sphere tf and gz skip spheres with effect smaller than tol"
+    x, y, z = data['x'], data['y'], data['z']
+    inc, dec = data['inc'], data['dec']
+    props = {'density': 1, 'magnetization': utils.ang2vec(1, 25, -10)}
+    far = [Sphere(x=1e6, y=-1e6, z=500, radius=10, props=props)]
+    for field in ['tf', 'gz']:
+        if field == 'tf':
+            result = sphere.tf(x, y, z, model + far, inc, dec, tol=1e-10)
+            true = sphere.tf(x, y, z, model, inc, dec)
+        else:
+            result = sphere.gz(x, y, z, model + far, tol=1e-10)
+            true = sphere.gz(x, y, z, model)
+        npt.assert_array_equal(result, true)
+        npt.assert_allclose(result, data[field], atol=1e-10, rtol=0)
+
+
+def test_sphere_mixed_magnetization(data, model):
+    "Sphere magnetic fields of spheres with different magnetizations add up"
+    x, y, z = data['x'], data['y'], data['z']
+    inc, dec = data['inc'], data['dec']
+    other = [Sphere(x=300, y=-200, z=800, radius=200,
+                    props={'magnetization': utils.ang2vec(3, -40, 70)})]
+    for field in 'bx by bz tf'.split():
+        if field == 'tf':
+            result = sphere.tf(x, y, z, model + other, inc, dec)
+            true = data[field] + sphere.tf(x, y, z, other, inc, dec)
+        else:
+            result = getattr(sphere, field)(x, y, z, model + other)
+            true = data[field] + getattr(sphere, field)(x, y, z, other)
+        npt.assert_allclose(result, true, atol=1e-10, rtol=0)
+
+
+def test_sphere_fails_different_shapes(data, model):
+    "Sphere tf and gz fail if the coordinate shapes can't be broadcast"
+    x, y, z = data['x'], data['y'], data['z']
+    inc, dec = data['inc'], data['dec']
+    for coords in [(x, y[:-1], z), (x, y, z[:-1]), (x[:-1], y, z)]:
+        with pytest.raises(ValueError):
+            sphere.tf(coords[0], coords[1], coords[2], model, inc, dec)
+        with pytest.raises(ValueError):
+            sphere.gz(coords[0], coords[1], coords[2], model)
+
+
+def test_sphere_broadcast_coordinates(data, model):
+    "Sphere tf and gz accept a scalar height like in NumPy broadcasting"
+    x, y, z = data['x'], data['y'], data['z']
+    inc, dec = data['inc'], data['dec']
+    height = z[0]
+    npt.assert_allclose(sphere.tf(x, y, height, model, inc, dec),
+                        data['tf'], atol=1e-10, rtol=0)
+    npt.assert_allclose(sphere.gz(x, y, height, model), data['gz'],
+                        atol=1e-10, rtol=0)
+    for field in 'bx by bz'.split():
+        npt.assert_allclose(getattr(sphere, field)(x, y, height, model),
+                            data[field], atol=1e-10, rtol=0)
+
+
+def test_sphere_tol_empty_coordinates(model):
+    "Sphere tf and gz with tol return an empty result for empty coordinates"
+    x = y = z = np.array([])
+    assert sphere.tf(x, y, z, model, 30, -10, tol=1e-10).size == 0
+    assert sphere.gz(x, y, z, model, tol=1e-10).size == 0
@@ -330,21 +330,35 @@ def dircos(inc, dec):
 
     Parameter:
 
-    * inc : float
+    * inc : float or array
         The inclination of the vector (in degrees)
-    * dec : float
+    * dec : float or array
         The declination of the vector (in degrees)
 
     Returns:
 
-    * vect : list = [x, y, z]
-        The unit vector
+    * vect : array = [x, y, z]
+        The unit vector. If *inc* and *dec* are arrays, each of x, y, and z
+        is an array with the components of every vector.
+
+    Examples::
+
+        >>> x, y, z = dircos(30, [0, 90])
+        >>> print(numpy.round(x, 3).tolist())
+        [0.866, 0.0]
+        >>> print(numpy.round(y, 3).tolist())
+        [0.0, 0.866]
+        >>> print(numpy.round(z, 3).tolist())
+        [0.5, 0.5]
 
     """
     d2r = numpy.pi / 180.
-    vect = [numpy.cos(d2r * inc) * numpy.cos(d2r * dec),
-            numpy.cos(d2r * inc) * numpy.sin(d2r * dec),
-            numpy.sin(d2r * inc)]
+    inc, dec = numpy.broadcast_arrays(d2r * numpy.asarray(inc),
+                                      d2r * numpy.asarray(dec))
+    cos_inc = numpy.cos(inc)
+    vect = numpy.array([cos_inc * numpy.cos(dec),
+                        cos_inc * numpy.sin(dec),
+                        numpy.sin(inc)])
     return vect
 
 
@@ -70,6 +70,49 @@ warnings.warn("This module will be removed in v0.6. We recommend the use of " +
               "specific functions will remain.")
 
 
+def _blit_draw(axes, artists):
+    """
+    Make a function that redraws only *artists* instead of the whole canvas.
+
+    Uses blitting: the background of *axes* is saved after every full draw of
+    the canvas (which also happens when the window is resized) and is restored
+    before drawing the artists on top of it. Falls back to drawing the whole
+    canvas if the backend doesn't support blitting.
+
+    Returns the drawing function and a function that undoes the blitting setup
+    (call it when done drawing so the artists show up in later draws).
+    """
+    canvas = axes.figure.canvas
+    if not getattr(canvas, 'supports_blit', False):
+        return canvas.draw, lambda: None
+    for artist in artists:
+        artist.set_animated(True)
+    # Hack because Python 2 doesn't like nonlocal variables that change value.
+    # Lists it doesn't mind.
+    background = [None]
+
+    def save_background(event):
+        background[0] = canvas.copy_from_bbox(axes.bbox)
+        for artist in artists:
+            axes.draw_artist(artist)
+
+    def draw():
+        if background[0] is None:
+            canvas.draw()
+            return
+        canvas.restore_region(background[0])
+        for artist in artists:
+            axes.draw_artist(artist)
+        canvas.blit(axes.bbox)
+
+    def stop():
+        canvas.mpl_disconnect(cid)
+        for artist in artists:
+            artist.set_animated(False)
+    cid = canvas.mpl_connect('draw_event', save_background)
+    return draw, stop
+
+
 def draw_polygon(area, axes, style='-', marker='o', color='k', width=2,
                  alpha=0.5, xy2ne=False):
     """
@@ -130,11 +173,9 @@ def draw_polygon(area, axes, style='-', marker='o', color='k', width=2,
                       linewidth=width)
     tmpline, = axes.plot([], [], marker=marker, linestyle=style, color=color,
                          linewidth=width)
-    draw = axes.figure.canvas.draw
+    draw, stop_blit = _blit_draw(axes, [line, tmpline])
     x = []
     y = []
-    plotx = []
-    ploty = []
     # Hack because Python 2 doesn't like nonlocal variables that change value.
     # Lists it doesn't mind.
     picking = [True]
@@ -156,40 +197,42 @@ def draw_polygon(area, axes, style='-', marker='o', color='k', width=2,
         if event.button == 1 and picking[0]:
             x.append(event.xdata)
             y.append(event.ydata)
-            plotx.append(event.xdata)
-            ploty.append(event.ydata)
         if event.button == 3 or event.button == 2 and picking[0]:
             if len(x) < 3:
                 axes.set_title("Need at least 3 points to make a polygon")
             else:
                 picking[0] = False
                 axes.set_title("Done! You can close the window now.")
-                plotx.append(x[0])
-                ploty.append(y[0])
                 tmpline.set_data([], [])
-                axes.fill(plotx, ploty, color=color, alpha=alpha)
-        line.set_data(plotx, ploty)
+                axes.fill(x, y, color=color, alpha=alpha)
+            # The title and fill are not redrawn by blitting
+            line.figure.canvas.draw()
+        if picking[0]:
+            line.set_data(x, y)
+        else:
+            # Close the polygon
+            line.set_data(x + x[:1], y + y[:1])
         draw()
 
     def erase(event):
         if event.key == 'e' and picking[0]:
             x.pop()
             y.pop()
-            plotx.pop()
-            ploty.pop()
-            line.set_data(plotx, ploty)
+            line.set_data(x, y)
             draw_guide(event.xdata, event.ydata)
             draw()
     line.figure.canvas.mpl_connect('button_press_event', pick)
     line.figure.canvas.mpl_connect('key_press_event', erase)
     line.figure.canvas.mpl_connect('motion_notify_event', move)
     pyplot.show()
+    stop_blit()
     if len(x) < 3:
         raise ValueError("Need at least 3 points to make a polygon")
+    verts = numpy.empty((len(x), 2))
     if xy2ne:
-        verts = numpy.transpose([y, x])
+        verts[:, 0], verts[:, 1] = y, x
     else:
-        verts = numpy.transpose([x, y])
+        verts[:, 0], verts[:, 1] = x, y
     return verts
 
 
@@ -242,11 +285,10 @@ def pick_points(area, axes, marker='o', color='k', size=8, xy2ne=False):
         axes.set_ylim(area[2], area[3])
     # start with an empty set
     line, = axes.plot([], [], marker=marker, color=color, markersize=size)
+    draw, stop_blit = _blit_draw(axes, [line])
     line.figure.canvas.draw()
     x = []
     y = []
-    plotx = []
-    ploty = []
     # Hack because Python 2 doesn't like nonlocal variables that change value.
     # Lists it doesn't mind.
     picking = [True]
@@ -257,30 +299,28 @@ def pick_points(area, axes, marker='o', color='k', size=8, xy2ne=False):
         if event.button == 1 and picking[0]:
             x.append(event.xdata)
             y.append(event.ydata)
-            plotx.append(event.xdata)
-            ploty.append(event.ydata)
             line.set_color(color)
             line.set_marker(marker)
             line.set_markersize(size)
             line.set_linestyle('')
-            line.set_data(plotx, ploty)
-            line.figure.canvas.draw()
+            line.set_data(x, y)
+            draw()
 
     def erase(event):
         if event.key == 'e' and picking[0]:
             x.pop()
             y.pop()
-            plotx.pop()
-            ploty.pop()
-            line.set_data(plotx, ploty)
-            line.figure.canvas.draw()
+            line.set_data(x, y)
+            draw()
     line.figure.canvas.mpl_connect('button_press_event', pick)
     line.figure.canvas.mpl_connect('key_press_event', erase)
     pyplot.show()
+    stop_blit()
+    points = numpy.empty((len(x), 2))
     if xy2ne:
-        points = numpy.transpose([y, x])
+        points[:, 0], points[:, 1] = y, x
     else:
-        points = numpy.transpose([x, y])
+        points[:, 0], points[:, 1] = x, y
     return points
 
 
@@ -342,16 +382,18 @@ def draw_layers(area, axes, style='-', marker='o', color='k', width=2):
     tmpline, = axes.plot([midv], [zmin], marker=marker, linestyle='--',
                          color=color, linewidth=width)
     # Make a proxy for drawing
-    draw = axes.figure.canvas.draw
+    draw, stop_blit = _blit_draw(axes, [line, tmpline])
     depths = [zmin]
     values = []
-    plotv = []
-    plotz = []
     tmpz = [zmin]
     # Hack because Python 2 doesn't like nonlocal variables that change value.
     # Lists it doesn't mind.
     picking = [True]
 
+    def draw_line():
+        # Each layer is a vertical segment from its top to its bottom depth
+        line.set_data(numpy.repeat(values, 2), numpy.repeat(depths, 2)[1:-1])
+
     def draw_guide(v, z):
         if len(values) == 0:
             tmpline.set_data([v, v], [tmpz[0], z])
@@ -377,10 +419,8 @@ def draw_layers(area, axes, style='-', marker='o', color='k', width=2):
             if z > tmpz[0]:
                 depths.append(z)
                 values.append(v)
-                plotz.extend([tmpz[0], z])
-                plotv.extend([v, v])
                 tmpz[0] = z
-                line.set_data(plotv, plotz)
+                draw_line()
                 draw()
 
     def erase(event):
@@ -388,17 +428,14 @@ def draw_layers(area, axes, style='-', marker='o', color='k', width=2):
             depths.pop()
             values.pop()
             tmpz[0] = depths[-1]
-            plotv.pop()
-            plotv.pop()
-            plotz.pop()
-            plotz.pop()
-            line.set_data(plotv, plotz)
+            draw_line()
             draw_guide(event.xdata, event.ydata)
             draw()
     line.figure.canvas.mpl_connect('button_press_event', pick)
     line.figure.canvas.mpl_connect('key_press_event', erase)
     line.figure.canvas.mpl_connect('motion_notify_event', move)
     pyplot.show()
+    stop_blit()
     thickness = [depths[i + 1] - depths[i] for i in range(len(depths) - 1)]
     return thickness, values
 
@@ -861,7 +898,7 @@ def contour(x, y, v, shape, levels, interp=False, extrapolate=False, color='k',
     """
     if style not in ['solid', 'dashed', 'mixed']:
         raise ValueError("Invalid contour style %s" % (style))
-    if x.shape != y.shape != v.shape:
+    if not (x.shape == y.shape == v.shape):
         raise ValueError("Input arrays x, y, and v must have same shape!")
     if interp:
         x, y, v = gridder.interp(x, y, v, shape, extrapolate=extrapolate)
@@ -925,7 +962,7 @@ def contourf(x, y, v, shape, levels, interp=False, extrapolate=False,
         List with the values of the contour levels
 
     """
-    if x.shape != y.shape != v.shape:
+    if not (x.shape == y.shape == v.shape):
         raise ValueError("Input arrays x, y, and v must have same shape!")
     if interp:
         x, y, v = gridder.interp(x, y, v, shape, extrapolate=extrapolate)
@@ -977,7 +1014,7 @@ def pcolor(x, y, v, shape, interp=False, extrapolate=False, cmap=pyplot.cm.jet,
         The axes element of the plot
 
     """
-    if x.shape != y.shape != v.shape:
+    if not (x.shape == y.shape == v.shape):
         raise ValueError("Input arrays x, y, and v must have same shape!")
     if vmin is None:
         vmin = v.min()